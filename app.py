@@ -3,35 +3,34 @@ AI 船期泊位管理系統 - Streamlit 主程式（萬海航運風格版 + 欄
 Version: 2.3 - 修正版（配合 berth_analysis v3.1）
 """
 import streamlit as st
-from modules.driver_manager import init_driver, check_driver_status
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-import pytz
 import time
 from pathlib import Path
 import os
+from types import MappingProxyType
 
 # ==================== 導入自定義模組 ====================
 
 from config import (
-    APP_TITLE, APP_VERSION, PORTS, TARGET_SHIP_NAME,
-    DB_PATH, DISCLAIMER, TIMEZONE, CACHE_TTL_MINUTES,
+    APP_TITLE, APP_VERSION, PORTS, PORT_OPTIONS, PORT_OPTION_INDEX, TARGET_SHIP_NAME,
+    DB_PATH, DISCLAIMER, TIMEZONE, TZINFO, CACHE_TTL_MINUTES,
     DEFAULT_SAFETY_BUFFER, DEFAULT_COMPETITION_WINDOW, DEFAULT_BERTH_DURATION
 )
 
 from modules.database import (
-    init_database, save_to_database, query_latest_data, 
+    init_database, migrate_database, save_to_database, query_latest_data, 
     is_cache_valid, get_cache_age,load_data_from_db
 )
 
-from modules.selenium_crawler import crawl_all_reports
+# Selenium / Plotly / AI 等較重的模組改於實際使用處延遲匯入
+# （driver_manager、selenium_crawler、visualization、ai_analyzer）
 
 from modules.data_processor import (
     normalize_port_tables, merge_ship_data, validate_data_quality
 )
 
-from modules.xml_exporter import export_all_reports
-
 # ✅ 確認從 modules.berth_analyzer 匯入
 from modules.berth_analyzer import (
     build_berth_timeline,
@@ -46,37 +45,17 @@ from modules.berth_analyzer import (
     get_specific_berth_info
 )
 
-from modules.visualization import (
-    create_berth_gantt_chart,
-    create_berth_capacity_chart,      
-    create_competition_chart,
-    create_ship_length_distribution,
-    create_port_summary_dashboard     
-)
-
-from modules.ai_analyzer import (
-    generate_berth_ai_analysis, format_ai_analysis
-)
-
 IS_CLOUD = os.getenv('STREAMLIT_SHARING_MODE') is not None
 if IS_CLOUD:
     st.sidebar.info("🌐 運行於 Streamlit Cloud")
 else:
     st.sidebar.info("💻 運行於本地環境")
 
-# 初始化資料庫
-from modules.database import init_database, migrate_database
-
-try:
-    init_database()
-    migrate_database()
-    st.sidebar.success("✓ 資料庫初始化完成")
-except Exception as e:
-    st.sidebar.error(f"✗ 資料庫初始化失敗: {e}")
 # ==================== 🆕 欄位中文化配置 ====================
+# 映射與顯示欄位皆為唯讀常數（MappingProxyType / tuple），可安全作為快取函數參數
 
 # D005 欄位映射（船席現況）
-D005_COLUMN_MAPPING = {
+D005_COLUMN_MAPPING = MappingProxyType({
     'port_name': '港口名稱',
     'wharf_code': '碼頭編號',
     'wharf_name': '碼頭名稱',
@@ -99,10 +78,10 @@ D005_COLUMN_MAPPING = {
     'visa_no': '簽證編號',
     'isps_level': '保全等級',
     'can_berth_container': '可停靠貨櫃碼頭'
-}
+})
 
 # D003 欄位映射（進港船舶）
-D003_COLUMN_MAPPING = {
+D003_COLUMN_MAPPING = MappingProxyType({
     'port_name': '港口名稱',
     'vessel_ename': '英文船名',
     'vessel_cname': '中文船名',
@@ -124,10 +103,10 @@ D003_COLUMN_MAPPING = {
     'vhf_report_time': 'VHF報到時間',
     'anchor_time': '下錨時間',
     'captain_report_eta': '船長報到ETA時間'
-}
+})
 
 # D004 欄位映射（出港船舶）
-D004_COLUMN_MAPPING = {
+D004_COLUMN_MAPPING = MappingProxyType({
     'port_name': '港口名稱',
     'vessel_ename': '英文船名',
     'vessel_cname': '中文船名',
@@ -146,26 +125,32 @@ D004_COLUMN_MAPPING = {
     'arrival_purpose': '到港目的',
     'visa_no': '簽證編號',
     'isps_level': '保全等級'
-}
+})
 
 # 🆕 顯示欄位配置（按順序）
-D005_DISPLAY_COLUMNS = [
+D005_DISPLAY_COLUMNS = (
     '港口名稱', '碼頭名稱', '碼頭編號','英文船名', '中文船名',
     '預計靠泊時間(ETB)', '實際靠泊時間(ATB)', '預定離泊時間(ETD)', '計畫引水時間',
     '上一港口', '預計下一港', '船長(m)', '船舶總重(GT)', '碼頭代理行'
-]
+)
 
-D003_DISPLAY_COLUMNS = [
+D003_DISPLAY_COLUMNS = (
     '港口名稱', '靠泊碼頭','英文船名', '中文船名', 'IMO Number',
     '預計到達時間(ETA)', '預計靠泊時間(ETB)', '實際靠泊時間(ATA)', '預計離舶時間(ETD)',
     '上一港口', '預計下一港', '船長(m)', '碼頭代理行'
-]
+)
 
-D004_DISPLAY_COLUMNS = [
+D004_DISPLAY_COLUMNS = (
     '港口名稱', '靠泊碼頭','英文船名', '中文船名', 'IMO Number',
     '預計出港時間(ETD)', '預計離泊時間(ETD)', '實際離泊時間(ATD)',
     '上一港口', '預計下一港', '船長(m)', '碼頭代理行'
-]
+)
+
+# 🆕 數值欄位顯示格式（保持數值型態，由 st.dataframe 於前端格式化）
+NUMERIC_COLUMN_CONFIG = {
+    '船長(m)': st.column_config.NumberColumn(format='%.1f'),
+    '船舶總重(GT)': st.column_config.NumberColumn(format='%d'),
+}
 
 
 #==================== Widget Keys 常數 ====================
@@ -187,9 +172,14 @@ class WidgetKeys:
 # 使用時
 # ==================== 🆕 格式化函數 ====================
 
+@st.cache_data(
+    ttl=CACHE_TTL_MINUTES * 60,
+    show_spinner=False,
+    hash_funcs={MappingProxyType: lambda mapping: tuple(mapping.items())}
+)
 def format_dataframe_for_display(df, column_mapping, display_columns):
     """
-    格式化 DataFrame 用於顯示
+    格式化 DataFrame 用於顯示（依輸入內容快取，重新執行時不重複格式化）
     
     Args:
         df: 原始 DataFrame
@@ -212,22 +202,49 @@ def format_dataframe_for_display(df, column_mapping, display_columns):
     available_columns = [col for col in display_columns if col in display_df.columns]
     display_df = display_df[available_columns]
     
-    # 處理空值
-    display_df = display_df.fillna('--')
-    
-    # 格式化數值欄位
-    if '船長(m)' in display_df.columns:
-        display_df['船長(m)'] = display_df['船長(m)'].apply(
-            lambda x: f"{float(x):.1f}" if str(x) not in ['--', '', 'nan'] else '--'
-        )
+    # 數值欄位保持數值型態（顯示格式見 NUMERIC_COLUMN_CONFIG），無效值為 NaN
+    numeric_columns = [col for col in NUMERIC_COLUMN_CONFIG if col in display_df.columns]
+    for col in numeric_columns:
+        display_df[col] = pd.to_numeric(display_df[col], errors='coerce')
     
+    # 總噸位取整數（與舊版 int(float(x)) 一致），以可為空值的 Int64 保留缺值
     if '船舶總重(GT)' in display_df.columns:
-        display_df['船舶總重(GT)'] = display_df['船舶總重(GT)'].apply(
-            lambda x: f"{int(float(x)):,}" if str(x) not in ['--', '', 'nan'] else '--'
-        )
+        display_df['船舶總重(GT)'] = np.trunc(display_df['船舶總重(GT)']).astype('Int64')
+    
+    # 文字欄位處理空值；原本即為字串的欄位轉為 Arrow 字串欄位（st.dataframe 以 Arrow 傳輸，省去 object 欄位轉換）
+    # 整數、日期等非字串欄位保留原型態，維持前端排序與顯示
+    text_columns = [col for col in display_df.columns if col not in numeric_columns]
+    string_columns = [col for col in text_columns if pd.api.types.infer_dtype(display_df[col], skipna=True) == 'string']
+    display_df[text_columns] = display_df[text_columns].fillna('--')
+    display_df[string_columns] = display_df[string_columns].astype('string[pyarrow]')
     
     return display_df
 
+
+def filter_by_vessel_name(display_df, search_term):
+    """
+    依船名（中文或英文）篩選已格式化的 DataFrame
+    
+    Args:
+        display_df: format_dataframe_for_display 的輸出
+        search_term: 搜尋關鍵字（不分大小寫，以字面比對）
+    
+    Returns:
+        篩選後的 DataFrame
+    """
+    term = search_term.lower()
+    mask = (
+        display_df['中文船名'].str.lower().str.contains(term, regex=False, na=False).to_numpy() |
+        display_df['英文船名'].str.lower().str.contains(term, regex=False, na=False).to_numpy()
+    )
+    return display_df[mask]
+
+
+@st.cache_data(ttl=CACHE_TTL_MINUTES * 60, max_entries=16, show_spinner=False)
+def dataframe_to_csv_bytes(df):
+    """將 DataFrame 轉為 CSV 下載內容（UTF-8 BOM，Excel 可直接開啟）"""
+    return df.to_csv(index=False).encode('utf-8-sig')
+
 # ==================== 頁面配置 ====================
 st.set_page_config(
     page_title=f"{APP_TITLE} - 萬海航運",
@@ -236,7 +253,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
+# 萬海風格全域樣式（Streamlit 每次 rerun 只保留該次輸出的元素，因此每次都需注入）
+WANHAI_CSS = """
 <style>
 :root {
   --wh-primary: #004B91;
@@ -304,6 +322,15 @@ h1, h2, h3 {
   transform: translateY(-2px);
 }
 
+/* 指標（全站 st.metric 共用漸層卡片樣式） */
+[data-testid="stMetric"] {
+  background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);
+  border: 1px solid var(--wh-border);
+  border-radius: var(--wh-radius);
+  padding: 1rem;
+  box-shadow: var(--wh-shadow);
+}
+
 /* 表格 */
 .dataframe {
   background: #0B305F;
@@ -342,15 +369,22 @@ input:focus, select:focus {
   color: var(--wh-text-light);
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(WANHAI_CSS, unsafe_allow_html=True)
 # ==================== 初始化 ====================
 @st.cache_resource
 def initialize_system():
-    """初始化系統（只執行一次）"""
+    """初始化系統（只執行一次；失敗時不快取，下次 rerun 會重試）"""
     init_database()
+    migrate_database()
     return True
 
-initialize_system()
+try:
+    initialize_system()
+    st.sidebar.success("✓ 資料庫初始化完成")
+except Exception as e:
+    st.sidebar.error(f"✗ 資料庫初始化失敗: {e}")
 
 # ==================== 🆕 Session State 初始化 ====================
 if 'selected_port' not in st.session_state:
@@ -375,7 +409,7 @@ if 'evaluation_result' not in st.session_state:
 if 'ai_analysis' not in st.session_state:
     st.session_state.ai_analysis = None
 if 'default_eta_time' not in st.session_state:
-    st.session_state.default_eta_time = datetime.now(pytz.timezone(TIMEZONE)).time()
+    st.session_state.default_eta_time = datetime.now(TZINFO).time()
     
 # ==================== 輔助函數 ====================
 def safe_format_datetime(dt_value, default="[未提供]"):
@@ -396,6 +430,64 @@ def safe_format_datetime(dt_value, default="[未提供]"):
     except Exception:
         return default
 
+
+# 報表代碼 → 資料表名稱
+CACHE_STATUS_TABLES = {
+    'D005': 'ifa_d005',
+    'D003': 'ifa_d003',
+    'D004': 'ifa_d004',
+}
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_cache_status(port_code, cache_hours=0.5):
+    """
+    一次取得三張報表的快取狀態（側邊欄與資料爬取頁共用）
+    
+    Args:
+        port_code: 港口代碼
+        cache_hours: 快取有效時數
+    
+    Returns:
+        dict: {'D005': (是否有效, 距上次爬取分鐘數或 None), ...}
+    """
+    return {
+        report: (
+            is_cache_valid(table, port_code, cache_hours=cache_hours),
+            get_cache_age(table, port_code)
+        )
+        for report, table in CACHE_STATUS_TABLES.items()
+    }
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def load_reports_from_db(port_code):
+    """
+    一次載入三張報表的資料庫快取（60 秒內重複載入不再讀取資料庫）
+    
+    Args:
+        port_code: 港口代碼
+    
+    Returns:
+        tuple: (d005_df, d003_df, d004_df)
+    """
+    return tuple(
+        load_data_from_db(table, port_code)
+        for table in CACHE_STATUS_TABLES.values()
+    )
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_berth_status_cached(port_code):
+    """get_berth_status 的快取版本（泊位資料只在重新爬取後才會變動）"""
+    return get_berth_status(port_code)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def search_vessel_in_port_cached(port_code, search_term):
+    """search_vessel_in_port 的快取版本（以港口與搜尋字串為鍵）"""
+    return search_vessel_in_port(port_code, search_term)
+
+
 # ==================== 側邊欄（統一港口選擇）====================
 with st.sidebar:
     st.markdown("### ⚙️ 系統設定")
@@ -403,9 +495,9 @@ with st.sidebar:
     # ✅ 唯一的港口選擇器
     st.session_state.selected_port = st.selectbox(
         "🏢 選擇港口",
-        options=list(PORTS.keys()),
+        options=PORT_OPTIONS,
         format_func=lambda x: f"{PORTS[x]} ({x})",
-        index=list(PORTS.keys()).index(st.session_state.selected_port),
+        index=PORT_OPTION_INDEX[st.session_state.selected_port],
         key="global_port_selector"
     )
     
@@ -437,41 +529,14 @@ with st.sidebar:
         if use_cache:
             st.markdown("#### 📊 快取狀態")
             
-            # D005 快取狀態
-            d005_valid = is_cache_valid('ifa_d005', selected_port, cache_hours=0.5)
-            d005_age = get_cache_age('ifa_d005', selected_port)
-            
-            if d005_age is not None:
-                if d005_valid:
-                    st.success(f"✓ D005: {d005_age:.0f} 分鐘前")
-                else:
-                    st.warning(f"⚠ D005: {d005_age:.0f} 分鐘前 (已過期)")
-            else:
-                st.error("✗ D005: 無快取")
-            
-            # D003 快取狀態
-            d003_valid = is_cache_valid('ifa_d003', selected_port, cache_hours=0.5)
-            d003_age = get_cache_age('ifa_d003', selected_port)
-            
-            if d003_age is not None:
-                if d003_valid:
-                    st.success(f"✓ D003: {d003_age:.0f} 分鐘前")
-                else:
-                    st.warning(f"⚠ D003: {d003_age:.0f} 分鐘前 (已過期)")
-            else:
-                st.error("✗ D003: 無快取")
-            
-            # D004 快取狀態
-            d004_valid = is_cache_valid('ifa_d004', selected_port, cache_hours=0.5)
-            d004_age = get_cache_age('ifa_d004', selected_port)
-            
-            if d004_age is not None:
-                if d004_valid:
-                    st.success(f"✓ D004: {d004_age:.0f} 分鐘前")
+            for report, (valid, age) in get_cache_status(selected_port).items():
+                if age is not None:
+                    if valid:
+                        st.success(f"✓ {report}: {age:.0f} 分鐘前")
+                    else:
+                        st.warning(f"⚠ {report}: {age:.0f} 分鐘前 (已過期)")
                 else:
-                    st.warning(f"⚠ D004: {d004_age:.0f} 分鐘前 (已過期)")
-            else:
-                st.error("✗ D004: 無快取")
+                    st.error(f"✗ {report}: 無快取")
     
     with st.expander("📊 分析參數", expanded=True):
         safety_buffer = st.number_input(
@@ -518,6 +583,7 @@ with st.sidebar:
     
     with st.expander("🔧 系統診斷"):
         if st.button("🔍 診斷 WebDriver", use_container_width=True, key="diagnose_button"):
+            from modules.driver_manager import check_driver_status
             status = check_driver_status()
             st.json(status)
     
@@ -548,46 +614,20 @@ with tab1:
     if use_cache:
         st.markdown("### 📊 查詢舶位狀態")
         
-        d005_valid = is_cache_valid('ifa_d005', selected_port, cache_hours=0.5)
-        d003_valid = is_cache_valid('ifa_d003', selected_port, cache_hours=0.5)
-        d004_valid = is_cache_valid('ifa_d004', selected_port, cache_hours=0.5)
+        cache_status = get_cache_status(selected_port)
         
-        all_cache_valid = d005_valid and d003_valid and d004_valid
+        all_cache_valid = all(valid for valid, _ in cache_status.values())
         
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if d005_valid:
-                age = get_cache_age('ifa_d005', selected_port)
-                # ✅ 檢查 age 是否為 None
-                if age is not None:
-                    st.success(f"✅ D005:上次爬取時間: {age:.0f} 分鐘前")
-                else:
-                    st.success("✅ D005: Database資料30分鐘內")
-            else:
-                st.error("❌ D005: 資料爬取超過30分鐘，請重新爬取")
-        
-        with col2:
-            if d003_valid:
-                age = get_cache_age('ifa_d003', selected_port)
-                # ✅ 檢查 age 是否為 None
-                if age is not None:
-                    st.success(f"✅ D003:上次爬取時間: {age:.0f} 分鐘前")
-                else:
-                    st.success("✅ D003: Database資料30分鐘內")
-            else:
-                st.error("❌ D003: 資料爬取超過30分鐘，請重新爬取")
-        
-        with col3:
-            if d004_valid:
-                age = get_cache_age('ifa_d004', selected_port)
-                # ✅ 檢查 age 是否為 None
-                if age is not None:
-                    st.success(f"✅ D004:上次爬取時間: {age:.0f} 分鐘前")
+        for col, (report, (valid, age)) in zip(st.columns(3), cache_status.items()):
+            with col:
+                if valid:
+                    # ✅ 檢查 age 是否為 None
+                    if age is not None:
+                        st.success(f"✅ {report}:上次爬取時間: {age:.0f} 分鐘前")
+                    else:
+                        st.success(f"✅ {report}: Database資料30分鐘內")
                 else:
-                    st.success("✅ D004: Database資料30分鐘內")
-            else:
-                st.error("❌ D004: 資料爬取超過30分鐘，請重新爬取")
+                    st.error(f"❌ {report}: 資料爬取超過30分鐘，請重新爬取")
         
         st.markdown("---")
         
@@ -641,15 +681,7 @@ with tab1:
                 progress_bar.progress(30)
                 
                 # 從資料庫讀取
-                from modules.database import load_data_from_db
-                
-                d005_df = load_data_from_db('ifa_d005', selected_port)
-                progress_bar.progress(50)
-                
-                d003_df = load_data_from_db('ifa_d003', selected_port)
-                progress_bar.progress(70)
-                
-                d004_df = load_data_from_db('ifa_d004', selected_port)
+                d005_df, d003_df, d004_df = load_reports_from_db(selected_port)
                 progress_bar.progress(90)
                 
                 from_cache = True
@@ -663,6 +695,8 @@ with tab1:
                 progress_bar.progress(10)
                 
                 # 呼叫爬取函數（強制爬取，不使用快取）
+                from modules.selenium_crawler import crawl_all_reports
+                
                 d005_df, d003_df, d004_df, from_cache = crawl_all_reports(
                     port_code=selected_port,
                     port_name=PORTS[selected_port],
@@ -673,6 +707,8 @@ with tab1:
                     cache_hours=0.5
                 )
                 
+                # 資料庫已寫入新資料，捨棄舊的載入結果
+                load_reports_from_db.clear()
                 progress_bar.progress(90)
             
             # 儲存到 session_state
@@ -682,7 +718,7 @@ with tab1:
                 'D004': d004_df,
                 'port_code': selected_port,
                 'port_name': PORTS[selected_port],
-                'timestamp': datetime.now(pytz.timezone(TIMEZONE)),
+                'timestamp': datetime.now(TZINFO),
                 'from_cache': from_cache
             }
             
@@ -709,7 +745,10 @@ with tab1:
                     unsafe_allow_html=True
                 )
             
-            # 強制重新載入
+            # 強制重新載入（清除快取狀態，讓側邊欄立即反映新資料）
+            get_cache_status.clear()
+            get_berth_status_cached.clear()
+            search_vessel_in_port_cached.clear()
             time.sleep(1)
             st.rerun()
             
@@ -721,94 +760,97 @@ with tab1:
             import traceback
             st.error(traceback.format_exc())
 # ==================== Tab 2: 資料檢視 ====================
-with tab2:
-    st.markdown('<div class="section-title">📊 資料檢視</div>', unsafe_allow_html=True)
+# Streamlit ≥1.37 為 st.fragment、1.33–1.36 為 st.experimental_fragment；
+# 舊版（目前鎖定 1.32）沒有 fragment，退回一般函數呼叫（行為與整頁 rerun 相同）
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+@fragment
+def render_review_tab(data, selected_port):
+    """資料檢視內容（以 fragment 執行，搜尋輸入時只重跑此區塊）"""
+    report_type = st.selectbox(
+        "📋 選擇報表類型",
+        options=['進港船舶表 (IFA_D003)', '出港船舶表 (IFA_D004)','船席現況及指泊表 (IFA_D005)'],
+        key="report_type_selector"
+    )
     
-    if not st.session_state.crawl_data['port_code']:
-        st.markdown("<div class='warning-box'><h3>⚠️ 請先爬取資料</h3><p>請前往「資料爬取」頁面執行資料爬取作業</p></div>", unsafe_allow_html=True)
+    # 根據報表類型選擇對應的映射和顯示欄位
+    if 'IFA_D005' in report_type:
+        df = data['D005']
+        icon = "🚢"
+        title = "在泊船舶列表"
+        column_mapping = D005_COLUMN_MAPPING
+        display_columns = D005_DISPLAY_COLUMNS
+    elif 'IFA_D003' in report_type:
+        df = data['D003']
+        icon = "⬇️"
+        title = "進港船舶列表"
+        column_mapping = D003_COLUMN_MAPPING
+        display_columns = D003_DISPLAY_COLUMNS
     else:
-        data = st.session_state.crawl_data
+        df = data['D004']
+        icon = "⬆️"
+        title = "出港船舶列表"
+        column_mapping = D004_COLUMN_MAPPING
+        display_columns = D004_DISPLAY_COLUMNS
+    
+    st.markdown(f'<div class="sub-section-title">{icon} {title}</div>', unsafe_allow_html=True)
+    
+    if df.empty:
+        st.markdown("<div class='info-box'>ℹ️ 目前無資料</div>", unsafe_allow_html=True)
+    else:
+        # 格式化顯示
+        display_df = format_dataframe_for_display(df, column_mapping, display_columns)
         
-        report_type = st.selectbox(
-            "📋 選擇報表類型",
-            options=['進港船舶表 (IFA_D003)', '出港船舶表 (IFA_D004)','船席現況及指泊表 (IFA_D005)'],
-            key="report_type_selector"
-        )
+        # 搜尋功能
+        search_term = st.text_input("🔍 搜尋船名（中文或英文）", key="search_vessel_input")
         
-        # 根據報表類型選擇對應的映射和顯示欄位
-        if 'IFA_D005' in report_type:
-            df = data['D005']
-            icon = "🚢"
-            title = "在泊船舶列表"
-            column_mapping = D005_COLUMN_MAPPING
-            display_columns = D005_DISPLAY_COLUMNS
-        elif 'IFA_D003' in report_type:
-            df = data['D003']
-            icon = "⬇️"
-            title = "進港船舶列表"
-            column_mapping = D003_COLUMN_MAPPING
-            display_columns = D003_DISPLAY_COLUMNS
+        if search_term:
+            filtered_df = filter_by_vessel_name(display_df, search_term)
+            st.markdown(f"<div class='info-box'>找到 <b>{len(filtered_df)}</b> 筆符合的資料</div>", unsafe_allow_html=True)
         else:
-            df = data['D004']
-            icon = "⬆️"
-            title = "出港船舶列表"
-            column_mapping = D004_COLUMN_MAPPING
-            display_columns = D004_DISPLAY_COLUMNS
+            filtered_df = display_df
         
-        st.markdown(f'<div class="sub-section-title">{icon} {title}</div>', unsafe_allow_html=True)
+        # 顯示統計
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("總筆數", len(filtered_df))
+        with col2:
+            if '港口' in filtered_df.columns or '港口名稱' in filtered_df.columns:
+                port_col = '港口' if '港口' in filtered_df.columns else '港口名稱'
+                st.metric("港口數", filtered_df[port_col].nunique())
+        with col3:
+            if '船長(m)' in filtered_df.columns:
+                lengths = filtered_df['船長(m)']
+                avg_length = lengths[lengths > 0].mean()
+                if not pd.isna(avg_length):
+                    st.metric("平均船長", f"{avg_length:.1f}m")
         
-        if df.empty:
-            st.markdown("<div class='info-box'>ℹ️ 目前無資料</div>", unsafe_allow_html=True)
-        else:
-            # 格式化顯示
-            display_df = format_dataframe_for_display(df, column_mapping, display_columns)
-            
-            # 搜尋功能
-            search_term = st.text_input("🔍 搜尋船名（中文或英文）", key="search_vessel_input")
-            
-            if search_term:
-                mask = (
-                    display_df['中文船名'].str.contains(search_term, case=False, na=False) |
-                    display_df['英文船名'].str.contains(search_term, case=False, na=False)
-                )
-                filtered_df = display_df[mask]
-                st.markdown(f"<div class='info-box'>找到 <b>{len(filtered_df)}</b> 筆符合的資料</div>", unsafe_allow_html=True)
-            else:
-                filtered_df = display_df
-            
-            # 顯示統計
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("總筆數", len(filtered_df))
-            with col2:
-                if '港口' in filtered_df.columns or '港口名稱' in filtered_df.columns:
-                    port_col = '港口' if '港口' in filtered_df.columns else '港口名稱'
-                    st.metric("港口數", filtered_df[port_col].nunique())
-            with col3:
-                if '船長(m)' in filtered_df.columns:
-                    valid_lengths = filtered_df['船長(m)'].replace('--', '0').astype(float)
-                    avg_length = valid_lengths[valid_lengths > 0].mean()
-                    if not pd.isna(avg_length):
-                        st.metric("平均船長", f"{avg_length:.1f}m")
-            
-            # 顯示表格
-            st.dataframe(
-                filtered_df,
-                use_container_width=True,
-                height=500,
-                hide_index=True
-            )
-            
-            # 下載按鈕
-            csv = filtered_df.to_csv(index=False, encoding='utf-8-sig')
-            st.download_button(
-                label="📥 下載 CSV 檔案",
-                data=csv,
-                file_name=f"{report_type.split(' ')[0]}_{selected_port}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True,
-                key="download_csv_button"
-            )
+        # 顯示表格
+        st.dataframe(
+            filtered_df,
+            use_container_width=True,
+            height=500,
+            hide_index=True,
+            column_config=NUMERIC_COLUMN_CONFIG
+        )
+        
+        # 下載按鈕
+        st.download_button(
+            label="📥 下載 CSV 檔案",
+            data=dataframe_to_csv_bytes(filtered_df),
+            file_name=f"{report_type.split(' ')[0]}_{selected_port}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv",
+            use_container_width=True,
+            key="download_csv_button"
+        )
+
+with tab2:
+    st.markdown('<div class="section-title">📊 資料檢視</div>', unsafe_allow_html=True)
+    
+    if not st.session_state.crawl_data['port_code']:
+        st.markdown("<div class='warning-box'><h3>⚠️ 請先爬取資料</h3><p>請前往「資料爬取」頁面執行資料爬取作業</p></div>", unsafe_allow_html=True)
+    else:
+        render_review_tab(st.session_state.crawl_data, selected_port)
 
 # ==================== Tab 3: 泊位分析（v4.0 整合版）====================
 with tab3:
@@ -833,7 +875,7 @@ with tab3:
             
             try:
                 # 取得泊位狀態
-                berth_status = get_berth_status(selected_port)
+                berth_status = get_berth_status_cached(selected_port)
                 
                 if 'error' in berth_status:
                     st.error(f"❌ {berth_status['error']}")
@@ -843,41 +885,10 @@ with tab3:
                     
                     col1, col2, col3, col4 = st.columns(4)
                     
-                    with col1:
-                        st.markdown(f"""
-                        <div class="metric-card" style="background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);">
-                          <div style="font-size: 2rem;">🏢</div>
-                          <div class="metric-value">{summary['total_berths']}</div>
-                          <div class="metric-label">總泊位數</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col2:
-                        st.markdown(f"""
-                        <div class="metric-card" style="background: linear-gradient(135deg, #10b981 0%, #059669 100%);">
-                          <div style="font-size: 2rem;">✅</div>
-                          <div class="metric-value">{summary['available_berths']}</div>
-                          <div class="metric-label">可用泊位</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col3:
-                        st.markdown(f"""
-                        <div class="metric-card" style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);">
-                          <div style="font-size: 2rem;">🚫</div>
-                          <div class="metric-value">{summary['occupied_berths']}</div>
-                          <div class="metric-label">占用泊位</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    
-                    with col4:
-                        st.markdown(f"""
-                        <div class="metric-card" style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);">
-                          <div style="font-size: 2rem;">🚢</div>
-                          <div class="metric-value">{summary['total_vessels']}</div>
-                          <div class="metric-label">停泊船舶</div>
-                        </div>
-                        """, unsafe_allow_html=True)
+                    col1.metric("🏢 總泊位數", summary['total_berths'])
+                    col2.metric("✅ 可用泊位", summary['available_berths'])
+                    col3.metric("🚫 占用泊位", summary['occupied_berths'])
+                    col4.metric("🚢 停泊船舶", summary['total_vessels'])
                     
                     st.markdown("---")
                     
@@ -890,7 +901,7 @@ with tab3:
                     )
                     
                     if search_vessel:
-                        results = search_vessel_in_port(selected_port, search_vessel)
+                        results = search_vessel_in_port_cached(selected_port, search_vessel)
                         
                         if results:
                             st.success(f"✅ 找到 {len(results)} 艘船")
@@ -1116,7 +1127,7 @@ with tab3:
             with col2:
                 eta_date = st.date_input(
                     "ETA(Day)",
-                    value=datetime.now(pytz.timezone(TIMEZONE)).date(),
+                    value=datetime.now(TZINFO).date(),
                     key=WidgetKeys.REALTIME_ETA_DATE
                 )
                 
@@ -1127,7 +1138,7 @@ with tab3:
                 )
             
             eta_datetime = datetime.combine(eta_date, eta_time)
-            eta_datetime = pytz.timezone(TIMEZONE).localize(eta_datetime)
+            eta_datetime = eta_datetime.replace(tzinfo=TZINFO)
             
             st.markdown(f"""
             <div class="info-box">
@@ -1366,11 +1377,19 @@ with tab4:
         data = st.session_state.crawl_data
         selected_port = data['port_code']
         
+        from modules.visualization import (
+            create_berth_gantt_chart,
+            create_berth_capacity_chart,
+            create_competition_chart,
+            create_ship_length_distribution,
+            create_port_summary_dashboard
+        )
+        
         # ==================== 1. 泊位占用甘特圖 ====================
         st.markdown('<div class="sub-section-title">📊 泊位占用甘特圖</div>', unsafe_allow_html=True)
         
         try:
-            berth_status = get_berth_status(selected_port)
+            berth_status = get_berth_status_cached(selected_port)
             
             if 'error' not in berth_status:
                 # 取得 ETA 和船長（如果有分析結果）
@@ -1424,7 +1443,7 @@ with tab4:
         st.markdown('<div class="sub-section-title">📊 泊位容量分析</div>', unsafe_allow_html=True)
         
         try:
-            berth_status = get_berth_status(selected_port)
+            berth_status = get_berth_status_cached(selected_port)
             
             if 'error' not in berth_status:
                 fig = create_berth_capacity_chart(berth_status)
@@ -1442,7 +1461,7 @@ with tab4:
         st.markdown('<div class="sub-section-title">📊 港口摘要儀表板</div>', unsafe_allow_html=True)
         
         try:
-            berth_status = get_berth_status(selected_port)
+            berth_status = get_berth_status_cached(selected_port)
             
             if 'error' not in berth_status:
                 fig = create_port_summary_dashboard(berth_status)
@@ -1484,48 +1503,17 @@ with tab4:
         st.markdown('<div class="sub-section-title">📋 統計摘要</div>', unsafe_allow_html=True)
         
         try:
-            berth_status = get_berth_status(selected_port)
+            berth_status = get_berth_status_cached(selected_port)
             
             if 'error' not in berth_status:
                 summary = berth_status['summary']
                 
                 col1, col2, col3, col4 = st.columns(4)
                 
-                with col1:
-                    st.markdown(f"""
-                    <div class="metric-card" style="background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);">
-                      <div style="font-size: 2rem;">🏢</div>
-                      <div class="metric-value">{summary['total_berths']}</div>
-                      <div class="metric-label">總泊位數</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"""
-                    <div class="metric-card" style="background: linear-gradient(135deg, #10b981 0%, #059669 100%);">
-                      <div style="font-size: 2rem;">✅</div>
-                      <div class="metric-value">{summary['available_berths']}</div>
-                      <div class="metric-label">可用泊位</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col3:
-                    st.markdown(f"""
-                    <div class="metric-card" style="background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%);">
-                      <div style="font-size: 2rem;">🚢</div>
-                      <div class="metric-value">{summary['total_vessels']}</div>
-                      <div class="metric-label">停泊船舶</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col4:
-                    st.markdown(f"""
-                    <div class="metric-card" style="background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);">
-                      <div style="font-size: 2rem;">📊</div>
-                      <div class="metric-value">{summary['avg_occupancy_rate']:.1f}%</div>
-                      <div class="metric-label">平均占用率</div>
-                    </div>
-                    """, unsafe_allow_html=True)
+                col1.metric("🏢 總泊位數", summary['total_berths'])
+                col2.metric("✅ 可用泊位", summary['available_berths'])
+                col3.metric("🚢 停泊船舶", summary['total_vessels'])
+                col4.metric("📊 平均占用率", f"{summary['avg_occupancy_rate']:.1f}%")
             else:
                 st.error(f"❌ {berth_status['error']}")
                 
@@ -1603,6 +1591,8 @@ with tab5:
                         st.stop()
                     
                     # 執行 AI 分析
+                    from modules.ai_analyzer import generate_berth_ai_analysis
+                    
                     ai_result = generate_berth_ai_analysis(
                         port_name=PORTS.get(selected_port, selected_port),
                         ship_type=TARGET_SHIP_NAME,
@@ -1677,7 +1667,7 @@ with tab5:
                                             {ai_result.get('analysis', '無分析內容')}
                                             
                                             ---
-                                            *報告產生時間: {datetime.now(pytz.timezone(TIMEZONE)).strftime('%Y-%m-%d %H:%M:%S')}*
+                                            *報告產生時間: {datetime.now(TZINFO).strftime('%Y-%m-%d %H:%M:%S')}*
 """
                         st.download_button(
                             label="⬇️ 下載 Markdown",
@@ -5,6 +5,7 @@ AI 船期泊位管理系統 - 配置文件（完整版 v2.5）
 import os
 from datetime import timedelta
 from pathlib import Path
+from zoneinfo import ZoneInfo
 # ==================== 應用程式資訊 ====================
 APP_TITLE = "AI 船期泊位管理系統"
 APP_VERSION = "v2.5"
@@ -28,6 +29,13 @@ PORTS = {
     'KHH': '高雄港'
 }
 
+# ✅ 港口名稱 → 代碼（反查表，避免每次線性掃描 PORTS）
+PORT_NAME_TO_CODE = {name: code for code, name in PORTS.items()}
+
+# ✅ 港口選單選項與索引（供介面選單使用）
+PORT_OPTIONS = tuple(PORTS)
+PORT_OPTION_INDEX = {code: i for i, code in enumerate(PORT_OPTIONS)}
+
 # ✅ 港口代碼對應（新舊代碼轉換）
 PORT_CODE_MAPPING = {
     'TP': 'TPE',   # 台北港
@@ -100,6 +108,7 @@ CACHE_TTL_MINUTES = 30  # 快取有效期（分鐘）
 # ==================== 時區設定 ====================
 TIMEZONE = 'Asia/Taipei'
 TIMEZ = TIMEZONE  # 別名，向後兼容
+TZINFO = ZoneInfo(TIMEZONE)  # 時區物件（模組載入時建立一次）
 
 # ==================== 泊位設定 ====================
 # ✅ 泊位資料庫欄位定義（配合 TaiwanPort_wharf_information.db）
@@ -650,11 +659,7 @@ def get_port_code(port_name_or_code):
         return PORT_CODE_MAPPING[port_name_or_code]
     
     # 如果是名稱，查找對應代碼
-    for code, name in PORTS.items():
-        if name == port_name_or_code:
-            return code
-    
-    return port_name_or_code
+    return PORT_NAME_TO_CODE.get(port_name_or_code, port_name_or_code)
 
 
 def normalize_port_code(port_code):